@@ -0,0 +1,22 @@
+"""
+In-process caches for API responses derived from the warehouse.
+The dataset only changes when the Dagster ETL runs, so entries are served
+until their TTL lapses or the ETL calls the invalidation endpoint.
+"""
+import threading
+from cachetools import TTLCache
+
+# Guards every cache below; TTLCache mutates internal state on reads
+cache_lock = threading.RLock()
+
+# Aggregate counts for /analytics/overview, keyed on "overview"
+overview_cache = TTLCache(maxsize=1, ttl=60)
+
+# Pre-serialized JSON bodies for the reference lists (/disciplines, /schools, /bootstrap)
+reference_cache = TTLCache(maxsize=3, ttl=300)
+
+def clear_caches():
+    """Drop all cached entries so the next request re-reads the database."""
+    with cache_lock:
+        overview_cache.clear()
+        reference_cache.clear()
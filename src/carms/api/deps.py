@@ -1,7 +1,15 @@
-from typing import Annotated
-from fastapi import Depends
-from sqlmodel import Session
+import secrets
+from typing import Annotated, Optional
+from fastapi import Depends, Header, HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
+from src.carms.config import settings
 from src.carms.db.engine import get_session
 
 # Re-export for convenience
-SessionDep = Annotated[Session, Depends(get_session)]
+SessionDep = Annotated[AsyncSession, Depends(get_session)]
+
+def require_internal_token(x_internal_token: Annotated[Optional[str], Header()] = None):
+    """Reject requests that do not carry the configured INTERNAL_API_TOKEN."""
+    expected = settings.INTERNAL_API_TOKEN
+    if not expected or not x_internal_token or not secrets.compare_digest(x_internal_token, expected):
+        raise HTTPException(status_code=403, detail="Invalid internal token")
@@ -4,30 +4,42 @@ Configures lifespan events, middleware, and router synchronization.
 """
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
-from src.carms.db.engine import engine
+from src.carms.db.engine import async_engine
+from src.carms.db import models  # noqa: F401 - registers the tables on SQLModel.metadata
 from sqlmodel import SQLModel
-from src.carms.api.routers import programs, analytics
+from src.carms.api.routers import programs, analytics, internal
+from src.carms.api.middleware import ETagMiddleware
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """
     Handles application startup and shutdown events.
-    Ensures database tables are created before the API starts accepting requests.
+    Ensures database tables are created before the API starts accepting requests,
+    and releases pooled connections on shutdown.
     """
-    from src.carms.db import models
-    SQLModel.metadata.create_all(engine)
+    async with async_engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
     yield
+    await async_engine.dispose()
 
 app = FastAPI(
     title="CaRMS Program Explorer API",
     description="Backend API providing access to processed CaRMS residency program data.",
     version="0.1.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+)
+
+# Let clients and intermediaries revalidate the reference lists and analytics
+app.add_middleware(
+    ETagMiddleware,
+    path_prefixes=["/api/v1/disciplines", "/api/v1/schools", "/api/v1/bootstrap", "/api/v1/analytics"],
+    max_age=60,
 )
 
 # Register API routes
 app.include_router(programs.router, prefix="/api/v1", tags=["programs"])
 app.include_router(analytics.router, prefix="/api/v1/analytics", tags=["analytics"])
+app.include_router(internal.router, prefix="/api/v1/internal", tags=["internal"])
 
 @app.get("/health")
 def health_check():
@@ -0,0 +1,39 @@
+"""
+HTTP caching middleware for the read-only API endpoints.
+"""
+import hashlib
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.responses import Response
+
+class ETagMiddleware(BaseHTTPMiddleware):
+    """
+    Adds ETag and Cache-Control headers to successful GET responses under the
+    configured path prefixes, and answers 304 Not Modified when the client's
+    If-None-Match already holds the current ETag.
+    Responses outside those prefixes are passed through without buffering.
+    """
+    def __init__(self, app, path_prefixes, max_age: int = 60):
+        super().__init__(app)
+        self.path_prefixes = tuple(path_prefixes)
+        self.cache_control = f"public, max-age={max_age}"
+
+    async def dispatch(self, request, call_next):
+        response = await call_next(request)
+        if (
+            request.method != "GET"
+            or response.status_code != 200
+            or not request.url.path.startswith(self.path_prefixes)
+        ):
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        etag = f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+        client_etags = {tag.strip() for tag in request.headers.get("if-none-match", "").split(",")}
+        if etag in client_etags or "*" in client_etags:
+            return Response(status_code=304, headers={"ETag": etag, "Cache-Control": self.cache_control})
+
+        headers = dict(response.headers)
+        headers["ETag"] = etag
+        headers["Cache-Control"] = self.cache_control
+        return Response(content=body, status_code=response.status_code, headers=headers)
@@ -1,57 +1,70 @@
-from fastapi import APIRouter
+import orjson
+from fastapi import APIRouter, Query, Response
 from sqlmodel import select, func
 from src.carms.api.deps import SessionDep
-from src.carms.db.models import Discipline, School, Program, ProgramSection
+from src.carms.db.models import (
+    Discipline, School, Program, ProgramSection,
+    program_counts_by_discipline, program_counts_by_school
+)
 from src.carms.api.schemas import AnalyticsOverview
+from src.carms.api.cache import cache_lock, overview_cache
 
 router = APIRouter()
 
 @router.get("/overview", response_model=AnalyticsOverview)
-def get_analytics_overview(session: SessionDep):
+async def get_analytics_overview(session: SessionDep):
     """
     Retrieve high-level statistics about the dataset, 
     including counts of programs, schools, and disciplines.
+    Results are cached in-process since the data only changes on ETL runs.
     """
-    total_programs = session.exec(select(func.count(Program.id))).one()
-    total_disciplines = session.exec(select(func.count(Discipline.id))).one()
-    total_schools = session.exec(select(func.count(School.id))).one()
-    
-    total_sections = session.exec(select(func.count(ProgramSection.id))).one()
+    with cache_lock:
+        cached = overview_cache.get("overview")
+    if cached is not None:
+        return cached
+
+    # Fetch all four counts in a single round-trip via scalar subqueries
+    stmt = select(
+        select(func.count()).select_from(Program).scalar_subquery(),
+        select(func.count()).select_from(Discipline).scalar_subquery(),
+        select(func.count()).select_from(School).scalar_subquery(),
+        select(func.count()).select_from(ProgramSection).scalar_subquery(),
+    )
+    total_programs, total_disciplines, total_schools, total_sections = (await session.exec(stmt)).one()
     avg_sections = total_sections / total_programs if total_programs > 0 else 0
     
-    return AnalyticsOverview(
+    overview = AnalyticsOverview(
         total_programs=total_programs,
         total_disciplines=total_disciplines,
         total_schools=total_schools,
         avg_sections_per_program=avg_sections
     )
+    with cache_lock:
+        overview_cache["overview"] = overview
+    return overview
 
-@router.get("/counts/disciplines")
-def get_program_counts_by_discipline(session: SessionDep):
+@router.get("/counts/disciplines", response_model=None)
+async def get_program_counts_by_discipline(session: SessionDep, top: int = Query(default=20, ge=1, le=200)):
     """
     Retrieve the distribution of residency programs across medical disciplines, 
-    sorted by program count in descending order.
+    sorted by program count in descending order and limited to the `top` entries.
+    Reads the materialized view refreshed by the ETL.
     """
-    stmt = (
-        select(Discipline.name, func.count(Program.id))
-        .join(Program, isouter=True)
-        .group_by(Discipline.name)
-        .order_by(func.count(Program.id).desc())
-    )
-    results = session.exec(stmt).all()
-    return [{"discipline": r[0], "count": r[1]} for r in results]
+    mv = program_counts_by_discipline
+    stmt = select(mv.c.name, mv.c.cnt).order_by(mv.c.cnt.desc()).limit(top)
+    results = (await session.exec(stmt)).all()
+    body = orjson.dumps([{"discipline": r[0], "count": r[1]} for r in results])
+    return Response(content=body, media_type="application/json")
 
-@router.get("/counts/schools")
-def get_program_counts_by_school(session: SessionDep):
+@router.get("/counts/schools", response_model=None)
+async def get_program_counts_by_school(session: SessionDep, top: int = Query(default=20, ge=1, le=200)):
     """
     Retrieve the distribution of residency programs across medical schools, 
-    sorted by program count in descending order.
+    sorted by program count in descending order and limited to the `top` entries.
+    Reads the materialized view refreshed by the ETL.
     """
-    stmt = (
-        select(School.name, func.count(Program.id))
-        .join(Program, isouter=True)
-        .group_by(School.name)
-        .order_by(func.count(Program.id).desc())
-    )
-    results = session.exec(stmt).all()
-    return [{"school": r[0], "count": r[1]} for r in results]
+    mv = program_counts_by_school
+    stmt = select(mv.c.name, mv.c.cnt).order_by(mv.c.cnt.desc()).limit(top)
+    results = (await session.exec(stmt)).all()
+    body = orjson.dumps([{"school": r[0], "count": r[1]} for r in results])
+    return Response(content=body, media_type="application/json")
@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+from src.carms.api.cache import clear_caches
+from src.carms.api.deps import require_internal_token
+
+# Service-to-service endpoints: token-protected and left out of the public docs
+router = APIRouter(dependencies=[Depends(require_internal_token)], include_in_schema=False)
+
+@router.post("/invalidate")
+async def invalidate_caches():
+    """
+    Clear the API's in-process response caches.
+    Called by the Dagster ETL once a reload of the warehouse has committed.
+    The caches are per-process: with several workers only the one serving
+    this request is cleared, and the others catch up when their TTLs lapse.
+    """
+    clear_caches()
+    return {"status": "invalidated"}
@@ -1,87 +1,210 @@
-from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Query
+from typing import Annotated, List, Optional
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import TypeAdapter
+from sqlalchemy import literal, literal_column, or_, union_all
+from sqlalchemy.orm import joinedload, selectinload
 from sqlmodel import select, func, col
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.carms.api.deps import SessionDep
-from src.carms.db.models import Discipline, School, Program, ProgramSection
+from src.carms.api.cache import cache_lock, reference_cache
+from src.carms.db.engine import async_engine
+from src.carms.db.models import Discipline, School, Program, program_name_tsv
 from src.carms.api.schemas import (
-    DisciplineRead, SchoolRead, ProgramRead, ProgramDetailRead, ProgramSectionRead
+    BootstrapRead, DisciplineRead, SchoolRead, ProgramPage, ProgramDetailRead, ProgramSectionRead
 )
 
 router = APIRouter()
 
+# Name search term; bounded so one- or two-letter input cannot force a near
+# full-table match and oversized input cannot bloat the query
+SearchParam = Annotated[Optional[str], Query(min_length=3, max_length=64)]
+
+async def cached_reference_json(session, key, model, read_model) -> bytes:
+    """
+    Return the JSON body for a full reference table.
+    Rows are validated and serialized once, then served from the cache
+    until it expires or the ETL invalidates it.
+    """
+    with cache_lock:
+        body = reference_cache.get(key)
+    if body is None:
+        rows = (await session.exec(select(model))).all()
+        adapter = TypeAdapter(List[read_model])
+        body = adapter.dump_json(adapter.validate_python(rows, from_attributes=True))
+        with cache_lock:
+            reference_cache[key] = body
+    return body
+
 @router.get("/disciplines", response_model=List[DisciplineRead])
-def get_disciplines(session: SessionDep):
+async def get_disciplines(session: SessionDep):
     """Retrieve all available medical disciplines."""
-    return session.exec(select(Discipline)).all()
+    body = await cached_reference_json(session, "disciplines", Discipline, DisciplineRead)
+    return Response(content=body, media_type="application/json")
 
 @router.get("/schools", response_model=List[SchoolRead])
-def get_schools(session: SessionDep):
+async def get_schools(session: SessionDep):
     """Retrieve all available medical schools."""
-    return session.exec(select(School)).all()
+    body = await cached_reference_json(session, "schools", School, SchoolRead)
+    return Response(content=body, media_type="application/json")
+
+@router.get("/bootstrap", response_model=BootstrapRead)
+async def get_bootstrap(session: SessionDep):
+    """
+    Retrieve every school and discipline in one request, for clients that
+    build their filter options up front.
+    """
+    with cache_lock:
+        body = reference_cache.get("bootstrap")
+    if body is None:
+        # Both reference tables in a single round-trip, tagged by kind
+        options = union_all(
+            select(literal("school").label("kind"), School.id, School.name),
+            select(literal("discipline").label("kind"), Discipline.id, Discipline.name),
+        ).subquery()
+        rows = (await session.exec(select(options.c.kind, options.c.id, options.c.name))).all()
+        bootstrap = BootstrapRead(
+            schools=[SchoolRead(id=r.id, name=r.name) for r in rows if r.kind == "school"],
+            disciplines=[DisciplineRead(id=r.id, name=r.name) for r in rows if r.kind == "discipline"],
+        )
+        body = bootstrap.model_dump_json().encode()
+        with cache_lock:
+            reference_cache["bootstrap"] = body
+    return Response(content=body, media_type="application/json")
+
+def apply_program_filters(stmt, school_id, discipline_id, search):
+    """Apply the shared school, discipline and name-search filters to a program query."""
+    if school_id:
+        stmt = stmt.where(Program.school_id == school_id)
+    if discipline_id:
+        stmt = stmt.where(Program.discipline_id == discipline_id)
+    if search:
+        # Word matches hit the full-text index; the trigram-backed ILIKE
+        # keeps partial-word matches working
+        ts_query = func.plainto_tsquery(literal_column("'simple'"), search)
+        stmt = stmt.where(or_(
+            program_name_tsv.op("@@")(ts_query),
+            col(Program.name).ilike(f"%{search}%"),
+        ))
+    return stmt
 
-@router.get("/programs", response_model=List[ProgramRead])
-def get_programs(
+# ProgramPage documents the payload; response_model=None skips revalidating it
+@router.get("/programs", response_model=None, responses={200: {"model": ProgramPage}})
+async def get_programs(
     session: SessionDep,
     school_id: Optional[int] = None,
     discipline_id: Optional[int] = None,
-    search: Optional[str] = None,
-    offset: int = 0,
-    limit: int = Query(default=100, le=1000),
+    search: SearchParam = None,
+    after_id: Optional[int] = None,
+    offset: int = Query(default=0, deprecated=True),
+    limit: int = Query(default=100, ge=1, le=1000),
 ):
     """
-    Retrieve a paginated list of residency programs.
-    Supports filtering by school, discipline, and name-based search.
+    Retrieve a page of residency programs ordered by id.
+    Supports filtering by school, discipline, and case-insensitive name search.
+    Pass the returned `next_cursor` as `after_id` to fetch the following page;
+    `offset` is kept only for older clients.
     """
     # Build query with joins for enriched data (school/discipline names)
-    stmt = (
+    stmt = apply_program_filters(
         select(Program, Discipline.name, School.name)
         .join(Discipline, isouter=True)
         .join(School, isouter=True)
+        .order_by(Program.id),
+        school_id, discipline_id, search,
     )
-    
-    # Apply filters
-    if school_id:
-        stmt = stmt.where(Program.school_id == school_id)
-    if discipline_id:
-        stmt = stmt.where(Program.discipline_id == discipline_id)
-    if search:
-        stmt = stmt.where(col(Program.name).contains(search))
+
+    # Keyset pagination walks the primary key index instead of skipping rows
+    if after_id is not None:
+        stmt = stmt.where(Program.id > after_id)
+    elif offset:
+        stmt = stmt.offset(offset)
         
-    results = session.exec(stmt.offset(offset).limit(limit)).all()
+    results = (await session.exec(stmt.limit(limit))).all()
     
-    response = []
-    for prog, disc_name, school_name in results:
-        response.append(ProgramRead(
-            id=prog.id,
-            name=prog.name,
-            description=prog.description,
-            url=prog.url,
-            discipline_id=prog.discipline_id,
-            school_id=prog.school_id,
-            discipline_name=disc_name,
-            school_name=school_name,
-            extra_data=prog.extra_data
-        ))
-        
-    return response
+    # Rows come straight from the database, so emit plain dicts for orjson
+    # rather than validating a ProgramRead per row
+    items = [
+        {
+            "id": prog.id,
+            "name": prog.name,
+            "description": prog.description,
+            "url": prog.url,
+            "discipline_id": prog.discipline_id,
+            "school_id": prog.school_id,
+            "discipline_name": disc_name,
+            "school_name": school_name,
+            "extra_data": prog.extra_data,
+        }
+        for prog, disc_name, school_name in results
+    ]
+
+    next_cursor = items[-1]["id"] if len(items) == limit else None
+    # Returning the response directly also skips jsonable_encoder's walk
+    body = orjson.dumps({"items": items, "next_cursor": next_cursor})
+    return Response(content=body, media_type="application/json")
+
+@router.get("/programs.ndjson", response_class=StreamingResponse)
+async def stream_programs(
+    school_id: Optional[int] = None,
+    discipline_id: Optional[int] = None,
+    search: SearchParam = None,
+    limit: Optional[int] = Query(default=None, ge=1),
+):
+    """
+    Stream residency programs as newline-delimited JSON, one program per line,
+    ordered by id. Accepts the same filters as `/programs` without paging, so
+    large exports are sent as rows arrive instead of being buffered.
+    """
+    stmt = apply_program_filters(
+        select(
+            Program.id, Program.name, Program.description, Program.url,
+            Program.discipline_id, Program.school_id,
+            Discipline.name.label("discipline_name"),
+            School.name.label("school_name"),
+            Program.extra_data,
+        )
+        .join(Discipline, isouter=True)
+        .join(School, isouter=True)
+        .order_by(Program.id),
+        school_id, discipline_id, search,
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+
+    async def ndjson_lines():
+        # Uses its own session: the request-scoped one is not guaranteed to
+        # stay open while the response body is still being sent
+        async with AsyncSession(async_engine) as session:
+            result = await session.stream(stmt.execution_options(yield_per=200))
+            async for row in result.mappings():
+                yield orjson.dumps(dict(row)) + b"\n"
+
+    return StreamingResponse(ndjson_lines(), media_type="application/x-ndjson")
 
 @router.get("/programs/{program_id}", response_model=ProgramDetailRead)
-def get_program_detail(program_id: int, session: SessionDep):
+async def get_program_detail(program_id: int, session: SessionDep):
     """
     Retrieve comprehensive details for a specific residency program,
     including its descriptive markdown sections.
     """
-    program = session.get(Program, program_id)
+    # Load the program with its discipline and school joined in, and its
+    # sections fetched by a single selectinload query alongside it
+    stmt = (
+        select(Program)
+        .where(Program.id == program_id)
+        .options(
+            joinedload(Program.discipline),
+            joinedload(Program.school),
+            selectinload(Program.sections),
+        )
+    )
+    program = (await session.exec(stmt)).first()
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
-        
-    # Fetch related display names
-    disc = session.get(Discipline, program.discipline_id) if program.discipline_id else None
-    school = session.get(School, program.school_id) if program.school_id else None
     
-    # Fetch detail sections
-    sections = session.exec(select(ProgramSection).where(ProgramSection.program_id == program_id)).all()
-    section_reads = [ProgramSectionRead(id=s.id, title=s.title, content=s.content) for s in sections]
+    section_reads = [ProgramSectionRead(id=s.id, title=s.title, content=s.content) for s in program.sections]
     
     return ProgramDetailRead(
         id=program.id,
@@ -90,8 +213,8 @@ def get_program_detail(program_id: int, session: SessionDep):
         url=program.url,
         discipline_id=program.discipline_id,
         school_id=program.school_id,
-        discipline_name=disc.name if disc else None,
-        school_name=school.name if school else None,
+        discipline_name=program.discipline.name if program.discipline else None,
+        school_name=program.school.name if program.school else None,
         extra_data=program.extra_data,
         sections=section_reads
     )
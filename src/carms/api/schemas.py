@@ -9,6 +9,10 @@ class SchoolRead(BaseModel):
     id: int
     name: str
 
+class BootstrapRead(BaseModel):
+    schools: List[SchoolRead] = []
+    disciplines: List[DisciplineRead] = []
+
 class ProgramSectionRead(BaseModel):
     id: int
     title: str
@@ -26,6 +30,11 @@ class ProgramRead(BaseModel):
     school_name: Optional[str] = None
     extra_data: Optional[str] = None # JSON string
 
+class ProgramPage(BaseModel):
+    items: List[ProgramRead] = []
+    # Pass as `after_id` to fetch the next page; None once exhausted
+    next_cursor: Optional[int] = None
+
 class ProgramDetailRead(ProgramRead):
     sections: List[ProgramSectionRead] = []
 
@@ -6,24 +6,67 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 import requests
+from requests.adapters import HTTPAdapter
 import os
+import json
 
 # API configuration via environment variables
 API_URL = os.getenv("API_URL", "http://localhost:8000/api/v1")
 st.set_page_config(page_title="CaRMS Program Explorer", layout="wide")
 
-def get_data(endpoint, params=None):
+@st.cache_resource
+def get_http_session():
     """
-    Utility function to fetch data from the backend API.
-    Handles standard HTTP errors and returns JSON payload.
+    Returns a pooled HTTP session shared across script reruns, so API calls
+    reuse open connections instead of reconnecting on every request.
     """
-    try:
-        response = requests.get(f"{API_URL}/{endpoint}", params=params)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=10, pool_maxsize=20)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+@st.cache_data(ttl=60)
+def fetch_json(endpoint, params=None):
+    """
+    Fetches a JSON payload from the backend API, cached for 60 seconds so
+    reruns of the script do not hit the network.
+    Raises on HTTP errors so that failures are never cached.
+    """
+    response = get_http_session().get(f"{API_URL}/{endpoint}", params=params)
+    response.raise_for_status()
+    return response.json()
+
+@st.cache_data(ttl=60)
+def fetch_ndjson(endpoint, params=None):
+    """
+    Fetches a newline-delimited JSON endpoint, decoding records line by line
+    as the response streams in. Cached like fetch_json.
+    """
+    with get_http_session().get(f"{API_URL}/{endpoint}", params=params, stream=True) as response:
         response.raise_for_status()
-        return response.json()
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+@st.cache_data(ttl=300)
+def fetch_filter_options():
+    """
+    Fetches the school and discipline filter options in a single request.
+    Cached for 5 minutes since reference data only changes on ETL runs.
+    """
+    response = get_http_session().get(f"{API_URL}/bootstrap")
+    response.raise_for_status()
+    return response.json()
+
+def get_data(fetch, *args, default=None, **kwargs):
+    """
+    Utility function to call one of the cached fetchers above.
+    Shows standard HTTP errors in the page and returns `default` instead.
+    """
+    try:
+        return fetch(*args, **kwargs)
     except requests.exceptions.RequestException as e:
         st.error(f"Error fetching data from API: {e}")
-        return []
+        return default
 
 def overview_page():
     """
@@ -33,7 +76,7 @@ def overview_page():
     st.title("Market Overview")
     
     try:
-        data = requests.get(f"{API_URL}/analytics/overview").json()
+        data = fetch_json("analytics/overview")
         col1, col2, col3, col4 = st.columns(4)
         col1.metric("Total Programs", data.get("total_programs", 0))
         col2.metric("Total Disciplines", data.get("total_disciplines", 0))
@@ -45,10 +88,10 @@ def overview_page():
     # Visualization: Programs by Discipline
     st.subheader("Programs by Discipline (Top 20)")
     try:
-        disc_counts = requests.get(f"{API_URL}/analytics/counts/disciplines").json()
+        disc_counts = fetch_json("analytics/counts/disciplines", {"top": 20})
         df_disc = pd.DataFrame(disc_counts)
         if not df_disc.empty:
-            fig = px.bar(df_disc.head(20), x='discipline', y='count', color='count', 
+            fig = px.bar(df_disc, x='discipline', y='count', color='count', 
                          title="Distribution by Discipline")
             st.plotly_chart(fig, use_container_width=True)
     except Exception:
@@ -57,10 +100,10 @@ def overview_page():
     # Visualization: Programs by School
     st.subheader("Programs by School (Top 20)")
     try:
-        school_counts = requests.get(f"{API_URL}/analytics/counts/schools").json()
+        school_counts = fetch_json("analytics/counts/schools", {"top": 20})
         df_school = pd.DataFrame(school_counts)
         if not df_school.empty:
-            fig = px.bar(df_school.head(20), x='school', y='count', color='count', 
+            fig = px.bar(df_school, x='school', y='count', color='count', 
                          title="Distribution by School")
             st.plotly_chart(fig, use_container_width=True)
     except Exception:
@@ -77,17 +120,22 @@ def explorer_page():
     st.sidebar.header("Search & Filters")
     
     # Load filter options
-    schools = get_data("schools")
+    filter_options = get_data(fetch_filter_options, default={})
+    
+    schools = filter_options.get("schools", [])
     school_options = {s['name']: s['id'] for s in schools}
     selected_school_name = st.sidebar.selectbox("School", ["All"] + list(school_options.keys()))
     selected_school_id = school_options.get(selected_school_name) if selected_school_name != "All" else None
     
-    disciplines = get_data("disciplines")
+    disciplines = filter_options.get("disciplines", [])
     disc_options = {d['name']: d['id'] for d in disciplines}
     selected_disc_name = st.sidebar.selectbox("Discipline", ["All"] + list(disc_options.keys()))
     selected_disc_id = disc_options.get(selected_disc_name) if selected_disc_name != "All" else None
     
-    search_query = st.sidebar.text_input("Search Program Name")
+    search_query = st.sidebar.text_input("Search Program Name", max_chars=64).strip()
+    if 0 < len(search_query) < 3:
+        st.sidebar.caption("Enter at least 3 characters to search.")
+        search_query = ""
     
     # Execute query with active filters
     params = {"limit": 100}
@@ -98,7 +146,7 @@ def explorer_page():
     if search_query:
         params['search'] = search_query
         
-    programs = get_data("programs", params=params)
+    programs = get_data(fetch_ndjson, "programs.ndjson", params=params, default=[])
     
     if programs:
         st.write(f"Showing {len(programs)} results")
@@ -120,7 +168,7 @@ def explorer_page():
         
         if selected_prog_name:
             prog_id = df[df['name'] == selected_prog_name].iloc[0]['id']
-            detail = requests.get(f"{API_URL}/programs/{prog_id}").json()
+            detail = fetch_json(f"programs/{prog_id}")
             
             st.markdown(f"### {detail['name']}")
             st.markdown(f"**Entity:** {detail['school_name']} | **Discipline:** {detail['discipline_name']}")
@@ -129,7 +177,6 @@ def explorer_page():
             
             # Display additional JSON metadata if available
             if detail.get('extra_data'):
-                import json
                 try:
                     meta = json.loads(detail['extra_data'])
                     with st.expander("Technical Metadata"):
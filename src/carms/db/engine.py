@@ -1,16 +1,32 @@
 """
 Database engine configuration and session management.
 """
-from sqlmodel import create_engine, Session
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 from src.carms.config import settings
 
-# Create the SQLAlchemy engine using the configured database URL
-engine = create_engine(settings.DATABASE_URL, echo=False)
+# Synchronous engine used by the ETL for schema creation and bulk loads
+engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, pool_recycle=1800, echo=False)
 
-def get_session():
+# Async engine backing the API, pointed at the same database through asyncpg.
+# The pool is sized for concurrent API requests; pre-ping and recycling
+# discard connections dropped by Postgres or the network while idle.
+async_engine = create_async_engine(
+    make_url(settings.DATABASE_URL).set(drivername="postgresql+asyncpg"),
+    pool_size=20,
+    max_overflow=10,
+    pool_timeout=30,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    echo=False,
+)
+
+async def get_session():
     """
-    Dependency for FastAPI endpoints to provide a database session.
-    Yields a Session object and ensures it is closed after use.
+    Dependency for FastAPI endpoints to provide an async database session.
+    Yields an AsyncSession and ensures it is closed after use.
     """
-    with Session(engine) as session:
+    async with AsyncSession(async_engine) as session:
         yield session
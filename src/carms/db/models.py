@@ -4,6 +4,7 @@ Uses SQLModel to define both the schema and the application-level models.
 """
 from typing import Optional, List
 from datetime import datetime
+from sqlalchemy import DDL, Index, column, event, func, table, text
 from sqlmodel import SQLModel, Field, Relationship
 
 class DisciplineBase(SQLModel):
@@ -31,31 +32,79 @@ class ProgramBase(SQLModel):
     name: str
     description: Optional[str] = None
     url: Optional[str] = None
-    discipline_id: Optional[int] = Field(default=None, foreign_key="discipline.id")
-    school_id: Optional[int] = Field(default=None, foreign_key="school.id")
+    discipline_id: Optional[int] = Field(default=None, foreign_key="discipline.id", index=True)
+    school_id: Optional[int] = Field(default=None, foreign_key="school.id", index=True)
     extra_data: Optional[str] = Field(default=None, description="JSON string containing extended program metadata")
 
 class Program(ProgramBase, table=True):
     """Database table for residency programs."""
+    # Trigram index so ILIKE '%search%' on program names avoids a sequential scan
+    __table_args__ = (
+        Index("program_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+    )
     id: Optional[int] = Field(default=None, primary_key=True)
     
     discipline: Optional[Discipline] = Relationship(back_populates="programs")
     school: Optional[School] = Relationship(back_populates="programs")
     sections: List["ProgramSection"] = Relationship(back_populates="program")
 
+# Full-text vector over program names. Shared by the GIN index below and the
+# /programs search filter so the planner can match the indexed expression.
+# 'simple' is inlined with text() so it is never sent as a bind parameter;
+# unlike literal_column(), text() still lets Index() resolve the table.
+program_name_tsv = func.to_tsvector(text("'simple'"), Program.__table__.c.name)
+Index("program_name_tsv_gin", program_name_tsv, postgresql_using="gin")
+
 class ProgramSectionBase(SQLModel):
     """Base fields for program-specific detail sections."""
     title: str
     content: str
-    program_id: Optional[int] = Field(default=None, foreign_key="program.id")
+    program_id: Optional[int] = Field(default=None, foreign_key="program.id", index=True)
 
 class ProgramSection(ProgramSectionBase, table=True):
     """Database table for program-specific detail sections (e.g., Markdown content)."""
     id: Optional[int] = Field(default=None, primary_key=True)
     program: Optional[Program] = Relationship(back_populates="sections")
 
+# The trigram operator class ships with the pg_trgm extension
+event.listen(SQLModel.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+
 class ETLRun(SQLModel, table=True):
     """Tracks the status and history of ETL operations."""
     id: Optional[int] = Field(default=None, primary_key=True)
     status: str
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+
+# Program counts per discipline/school name, precomputed for the analytics
+# endpoints. Rows are keyed on name because the source data assigns many ids
+# to the same school. The views are created alongside the tables and refreshed
+# by the ETL after each load; the unique name index is required for
+# REFRESH ... CONCURRENTLY.
+PROGRAM_COUNT_VIEWS = {
+    "mv_program_counts_by_discipline": (
+        "SELECT d.name, COUNT(p.id) AS cnt FROM discipline d "
+        "LEFT JOIN program p ON p.discipline_id = d.id GROUP BY d.name"
+    ),
+    "mv_program_counts_by_school": (
+        "SELECT s.name, COUNT(p.id) AS cnt FROM school s "
+        "LEFT JOIN program p ON p.school_id = s.id GROUP BY s.name"
+    ),
+}
+
+for view_name, view_query in PROGRAM_COUNT_VIEWS.items():
+    event.listen(SQLModel.metadata, "after_create", DDL(
+        f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view_name} AS {view_query}"
+    ))
+    event.listen(SQLModel.metadata, "after_create", DDL(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {view_name}_name ON {view_name} (name)"
+    ))
+    event.listen(SQLModel.metadata, "after_create", DDL(
+        f"CREATE INDEX IF NOT EXISTS {view_name}_cnt ON {view_name} (cnt DESC)"
+    ))
+
+program_counts_by_discipline = table(
+    "mv_program_counts_by_discipline", column("name"), column("cnt")
+)
+program_counts_by_school = table(
+    "mv_program_counts_by_school", column("name"), column("cnt")
+)
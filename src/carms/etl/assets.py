@@ -2,73 +2,185 @@
 Dagster assets for ETL processing of CaRMS data.
 Handles extraction from Excel/JSON, transformation, and loading into PostgreSQL.
 """
-from dagster import asset, Output, MetadataValue
-import pandas as pd
+from dagster import asset, Output
+import polars as pl
 import os
-import zipfile
-import io
-import json
+import tempfile
+import codecs
+import orjson
+import requests
+import adbc_driver_postgresql.dbapi
 from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from src.carms.config import settings
-from src.carms.db.models import Discipline, School, Program, ProgramSection
+from src.carms.db.models import PROGRAM_COUNT_VIEWS
 from src.carms.db.engine import engine
 
+# Output schema of program_descriptions_df, also used when the source is missing
+DESCRIPTION_SCHEMA = {"program_id": pl.Int32, "title": pl.String, "content": pl.String, "extra_data": pl.String}
+
+# program_id is the last path segment of a description's source URL, or the one before it
+PROGRAM_ID_PATTERNS = (r"(?:^|/)(\d+)$", r"(?:^|/)(\d+)/[^/]*$")
+
+# A description's title is its first markdown line
+TITLE_PATTERN = r"^([^\n]*)"
+
+# Columns of 1503_program_master.xlsx consumed by the transform assets
+PROGRAM_MASTER_COLUMNS = [
+    "program_stream_id", "school_id", "school_name", "discipline_id", "program_name", "program_url"
+]
+
+def invalidate_api_caches():
+    """
+    Asks the API to drop its cached aggregates after a reload.
+    Failures are non-fatal: cached entries still expire on their TTL.
+    """
+    if not settings.INTERNAL_API_TOKEN:
+        print("INTERNAL_API_TOKEN is not set; API caches will expire on their TTL")
+        return
+    try:
+        requests.post(
+            f"{settings.API_URL}/internal/invalidate",
+            headers={"X-Internal-Token": settings.INTERNAL_API_TOKEN},
+            timeout=5,
+        ).raise_for_status()
+    except requests.exceptions.RequestException as e:
+        print(f"Could not invalidate API caches: {e}")
+
+def adbc_connect():
+    """
+    Opens an ADBC connection to the warehouse for Arrow-native bulk loads.
+    libpq takes a plain postgresql:// URI, so the SQLAlchemy driver suffix is dropped.
+    """
+    uri = make_url(settings.DATABASE_URL).set(drivername="postgresql").render_as_string(hide_password=False)
+    return adbc_driver_postgresql.dbapi.connect(uri)
+
+def bulk_ingest(cur, table: str, df: pl.DataFrame, temporary: bool = False):
+    """
+    Appends a DataFrame to a table through ADBC, which streams the Arrow
+    data with binary COPY instead of binding Python values row by row.
+    Binary COPY needs column widths that match the table, so integer ids
+    must already be Int32 for the warehouse's INTEGER columns.
+    Runs on the cursor's connection, inside its current transaction.
+    Temporary tables live in the session's pg_temp schema, not public, so
+    ADBC has to be told to look them up there.
+    """
+    if df.is_empty():
+        return
+    cur.adbc_ingest(table, df.to_arrow(), mode="append", temporary=temporary)
+
+def stage(cur, table: str, df: pl.DataFrame) -> str:
+    """
+    Copies a DataFrame into a temporary, unindexed staging table shaped like
+    the given columns of `table`, and returns the column list for the swap.
+    The staging table is dropped when the transaction commits.
+    """
+    cols = ", ".join(df.columns)
+    cur.execute(f"CREATE TEMP TABLE {table}_staging ON COMMIT DROP AS SELECT {cols} FROM {table} WITH NO DATA")
+    bulk_ingest(cur, f"{table}_staging", df, temporary=True)
+    return cols
+
+def excel_to_parquet(name: str, columns=None) -> str:
+    """
+    Converts a workbook under RAW_DATA_DIR to Parquet under CACHE_DATA_DIR and
+    returns the Parquet path. The source files rarely change, so the
+    conversion only reruns when the workbook is newer than its cached copy
+    or the cached copy holds a different set of columns.
+    """
+    xlsx_path = os.path.join(settings.RAW_DATA_DIR, f"{name}.xlsx")
+    parquet_path = os.path.join(settings.CACHE_DATA_DIR, f"{name}.parquet")
+    if (
+        os.path.exists(parquet_path)
+        and os.path.getmtime(parquet_path) >= os.path.getmtime(xlsx_path)
+        and (columns is None or set(pl.read_parquet_schema(parquet_path)) == set(columns))
+    ):
+        return parquet_path
+
+    os.makedirs(settings.CACHE_DATA_DIR, exist_ok=True)
+    df = pl.read_excel(xlsx_path, engine="calamine", columns=columns)
+    # Write next to the target and rename it into place, so an interrupted
+    # run never leaves a truncated file that looks fresh
+    fd, tmp_path = tempfile.mkstemp(dir=settings.CACHE_DATA_DIR, suffix=".parquet.tmp")
+    os.close(fd)
+    try:
+        df.write_parquet(tmp_path, compression="zstd", statistics=True)
+        os.replace(tmp_path, parquet_path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+    return parquet_path
+
+@asset
+def disciplines_parquet() -> str:
+    """
+    Caches 1503_discipline.xlsx as Parquet.
+    """
+    return excel_to_parquet("1503_discipline")
+
 @asset
-def raw_disciplines_df() -> pd.DataFrame:
+def programs_parquet() -> str:
     """
-    Extracts raw discipline data from the 1503_discipline.xlsx file.
+    Caches the used columns of 1503_program_master.xlsx as Parquet.
     """
-    file_path = os.path.join(settings.RAW_DATA_DIR, "1503_discipline.xlsx")
-    return pd.read_excel(file_path)
+    return excel_to_parquet("1503_program_master", columns=PROGRAM_MASTER_COLUMNS)
 
 @asset
-def raw_programs_df() -> pd.DataFrame:
+def raw_disciplines_df(disciplines_parquet: str) -> pl.DataFrame:
     """
-    Extracts raw program master data from the 1503_program_master.xlsx file.
+    Extracts raw discipline data from the cached 1503_discipline workbook.
     """
-    file_path = os.path.join(settings.RAW_DATA_DIR, "1503_program_master.xlsx")
-    return pd.read_excel(file_path)
+    return pl.read_parquet(disciplines_parquet)
 
 @asset
-def transform_disciplines_asset(raw_disciplines_df: pd.DataFrame) -> pd.DataFrame:
+def raw_programs_df(programs_parquet: str) -> pl.DataFrame:
+    """
+    Extracts raw program master data from the cached 1503_program_master workbook.
+    Only the columns used downstream are materialized.
+    """
+    df = pl.read_parquet(programs_parquet, columns=PROGRAM_MASTER_COLUMNS)
+    # IDs are stored as text in the workbook; parse them at the warehouse's INTEGER width
+    return df.with_columns(pl.col("program_stream_id", "school_id", "discipline_id").cast(pl.Int32))
+
+@asset
+def transform_disciplines_asset(raw_disciplines_df: pl.DataFrame) -> pl.DataFrame:
     """
     Standardizes discipline names and ensures schema alignment.
     """
-    df = raw_disciplines_df.copy()
-    df = df.rename(columns={"discipline": "name"})
-    return df[["discipline_id", "name"]]
+    return raw_disciplines_df.select(
+        # Stored as text in the workbook; the warehouse key is an integer
+        pl.col("discipline_id").cast(pl.Int32),
+        pl.col("discipline").alias("name"),
+    )
 
 @asset
-def transform_schools_asset(raw_programs_df: pd.DataFrame) -> pd.DataFrame:
+def transform_schools_asset(raw_programs_df: pl.DataFrame) -> pl.DataFrame:
     """
     Extracts unique school entities from the raw program list.
     """
-    df = raw_programs_df[['school_id', 'school_name']].drop_duplicates().copy()
-    df = df.rename(columns={"school_id": "id", "school_name": "name"})
-    return df
+    return raw_programs_df.select(
+        pl.col("school_id").alias("id"),
+        pl.col("school_name").alias("name"),
+    ).unique(subset=["id"], keep="any")
 
 @asset
-def transform_programs_asset(raw_programs_df: pd.DataFrame) -> pd.DataFrame:
+def transform_programs_asset(raw_programs_df: pl.DataFrame) -> pl.DataFrame:
     """
     Cleans and standardizes program information, mapping columns to the target schema.
     """
-    df = raw_programs_df.copy()
     # Map raw columns to standardized DB schema names
-    df = df.rename(columns={
+    df = raw_programs_df.rename({
         "program_stream_id": "id", 
         "program_name": "name", 
         "program_url": "url"
     })
     
     # Ensure all required columns exist for the database model
-    for col in ["id", "school_id", "discipline_id", "name", "url"]:
-        if col not in df.columns:
-            df[col] = None
-            
-    return df[["id", "school_id", "discipline_id", "name", "url"]]
+    columns = ["id", "school_id", "discipline_id", "name", "url"]
+    missing = [c for c in columns if c not in df.columns]
+    return df.with_columns([pl.lit(None).alias(c) for c in missing]).select(columns)
 
 @asset
-def program_descriptions_df() -> pd.DataFrame:
+def program_descriptions_df() -> pl.DataFrame:
     """
     Parses markdown descriptions and metadata from the source JSON file.
     Extracts IDs and titles from embedded content and URLs.
@@ -76,49 +188,48 @@ def program_descriptions_df() -> pd.DataFrame:
     json_path = os.path.join(settings.RAW_DATA_DIR, "1503_markdown_program_descriptions.json")
     
     try:
-        with open(json_path, 'r', encoding='utf-8-sig') as f:
-            data = json.load(f)
+        # orjson parses the raw bytes directly; it rejects a BOM, so strip it first
+        with open(json_path, 'rb') as f:
+            data = orjson.loads(f.read().removeprefix(codecs.BOM_UTF8))
     except Exception as e:
         print(f"Error loading descriptions JSON: {e}")
-        return pd.DataFrame()
-
-    rows = []
-    for item in data:
-        content = item.get("page_content", "")
-        metadata = item.get("metadata", {})
-        source_url = metadata.get("source", "")
-        
-        # Parse program_id from the source URL structure
-        try:
-            parts = source_url.split('?')[0].split('/')
-            if parts[-1].isdigit():
-                prog_id = int(parts[-1])
-            elif parts[-2].isdigit():
-                 prog_id = int(parts[-2])
-            else:
-                continue
-                
-            # Extract title from the first line of markdown content
-            lines = content.split('\n')
-            title = lines[0].replace('#', '').strip() if lines else "Program Description"
-            
-            rows.append({
-                "program_id": prog_id,
-                "title": title,
-                "content": content,
-                "extra_data": json.dumps(metadata)
-            })
-        except Exception:
-            continue
+        return pl.DataFrame(schema=DESCRIPTION_SCHEMA)
+
+    # Build the columns in one pass, then parse them with vectorized string kernels
+    dumps = orjson.dumps
+    metadata = [item.get("metadata", {}) for item in data]
+    df = pl.DataFrame(
+        {
+            "content": [item.get("page_content", "") for item in data],
+            "source": [m.get("source", "") for m in metadata],
+            "extra_data": [dumps(m).decode() for m in metadata],
+        },
+        schema={"content": pl.String, "source": pl.String, "extra_data": pl.String},
+    )
+
+    path = pl.col("source").str.split("?").list.first()
+    program_id = pl.coalesce(*(path.str.extract(p) for p in PROGRAM_ID_PATTERNS)).cast(pl.Int32)
 
-    return pd.DataFrame(rows)
+    # Strip the heading markers from the title line
+    title = (
+        pl.col("content")
+        .str.extract(TITLE_PATTERN)
+        .str.replace_all("#", "", literal=True)
+        .str.strip_chars()
+    )
+
+    return (
+        df.with_columns(program_id.alias("program_id"), title.alias("title"))
+        .drop_nulls("program_id")
+        .select("program_id", "title", "content", "extra_data")
+    )
 
 @asset
 def load_to_postgres(
-    transform_disciplines_asset: pd.DataFrame,
-    transform_schools_asset: pd.DataFrame,
-    transform_programs_asset: pd.DataFrame,
-    program_descriptions_df: pd.DataFrame
+    transform_disciplines_asset: pl.DataFrame,
+    transform_schools_asset: pl.DataFrame,
+    transform_programs_asset: pl.DataFrame,
+    program_descriptions_df: pl.DataFrame
 ):
     """
     Orchestrates the loading of all transformed assets into PostgreSQL.
@@ -127,41 +238,40 @@ def load_to_postgres(
     from sqlmodel import SQLModel
     SQLModel.metadata.create_all(engine)
 
+    # Additional metadata for the Program table from the JSON payload, joined
+    # in before the load so it lands with the program rows
+    meta_df = (
+        program_descriptions_df.select(pl.col("program_id").alias("id"), "extra_data")
+        .drop_nulls()
+        .unique(subset=["id"], keep="last")
+    )
+    programs_df = transform_programs_asset.join(meta_df, on="id", how="left")
+
+    with adbc_connect() as conn, conn.cursor() as cur:
+        # Stream everything into staging tables first; the live tables stay
+        # readable by the API while the bulk of the load runs
+        staged = {
+            "discipline": stage(cur, "discipline", transform_disciplines_asset.rename({"discipline_id": "id"})),
+            "school": stage(cur, "school", transform_schools_asset),
+            "program": stage(cur, "program", programs_df),
+            "programsection": stage(cur, "programsection", program_descriptions_df.select("program_id", "title", "content")),
+        }
+
+        # Swap the staged rows in. Only this server-side copy runs under the
+        # exclusive lock from TRUNCATE; tables are filled in foreign key order.
+        cur.execute("TRUNCATE TABLE programsection, program, school, discipline RESTART IDENTITY CASCADE")
+        for table, cols in staged.items():
+            cur.execute(f"INSERT INTO {table} ({cols}) SELECT {cols} FROM {table}_staging")
+
+        conn.commit()
+
+    # Recompute the analytics views from the committed data; CONCURRENTLY
+    # keeps them readable by the API while the refresh runs
     with engine.begin() as conn:
-        # Clear existing data using CASCADE to handle foreign key dependencies
-        conn.execute(text("TRUNCATE TABLE programsection, program, school, discipline RESTART IDENTITY CASCADE"))
-        
-        # Load core lookup tables first
-        transform_disciplines_asset.rename(columns={"discipline_id": "id"}).to_sql(
-            "discipline", conn, if_exists="append", index=False
-        )
-        
-        transform_schools_asset.to_sql(
-            "school", conn, if_exists="append", index=False
-        )
-        
-        # Load main entities
-        transform_programs_asset.to_sql(
-            "program", conn, if_exists="append", index=False
-        )
-        
-        # Load optional detail sections and update metadata
-        if not program_descriptions_df.empty:
-            # Insert into ProgramSection table
-            sections_df = program_descriptions_df[["program_id", "title", "content"]].copy()
-            sections_df.to_sql("programsection", conn, if_exists="append", index=False)
-            
-            # Update additional metadata on the Program table from the JSON payload
-            meta_df = program_descriptions_df[["program_id", "extra_data"]].dropna()
-            if not meta_df.empty:
-                meta_df.to_sql("temp_program_meta", conn, if_exists="replace", index=False)
-                conn.execute(text("""
-                    UPDATE program
-                    SET extra_data = temp_program_meta.extra_data
-                    FROM temp_program_meta
-                    WHERE program.id = temp_program_meta.program_id
-                """))
-                conn.execute(text("DROP TABLE temp_program_meta"))
+        for view_name in PROGRAM_COUNT_VIEWS:
+            conn.execute(text(f"REFRESH MATERIALIZED VIEW CONCURRENTLY {view_name}"))
+
+    invalidate_api_caches()
             
     return Output(None, metadata={
         "disciplines_count": len(transform_disciplines_asset),
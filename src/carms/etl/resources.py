@@ -1,9 +1,25 @@
+from functools import lru_cache
 from dagster import ConfigurableResource
 from sqlalchemy import create_engine
 from src.carms.config import settings
 
+@lru_cache(maxsize=None)
+def _engine_for(connection_string: str):
+    """
+    One engine (and connection pool) per connection string for the process.
+    psycopg2's batch helpers are enabled for executemany-style INSERT/UPDATEs.
+    """
+    return create_engine(
+        connection_string,
+        executemany_mode="values_plus_batch",
+        insertmanyvalues_page_size=1000,
+        executemany_batch_page_size=500,
+        pool_size=5,
+        pool_pre_ping=True,
+    )
+
 class PostgresResource(ConfigurableResource):
     connection_string: str = settings.DATABASE_URL
-    
+
     def get_engine(self):
-        return create_engine(self.connection_string)
+        return _engine_for(self.connection_string)